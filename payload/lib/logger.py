@@ -0,0 +1,1133 @@
+"""
+Logging library for meta-agent architecture v2.0.
+
+Features:
+- JSONL format with correlation tracking
+- Hook support (PreToolUse, PostToolUse, SessionStart, SessionEnd)
+- Context compaction logging
+- Session continuity across agents
+"""
+from __future__ import annotations
+
+import asyncio
+import atexit
+import itertools
+import json
+import mmap
+import os
+import queue
+import re
+import reprlib
+import subprocess
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from enum import Enum
+from functools import lru_cache
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Callable, Literal
+
+try:
+    # Optional fast JSON encoder; the hub stays dependency-free without it.
+    import orjson
+except ImportError:
+    orjson = None
+
+LogLevel = Literal["debug", "info", "warn", "error", "fatal"]
+
+# log-format.md: msg is human-readable and capped below 100 chars.
+_MSG_LIMIT = 100
+
+# Tool payload truncation cap for hook events (chars, post-repr).
+_TOOL_LIMIT = 500
+
+# reprlib stops descending into large containers instead of rendering
+# them fully and throwing 99% of the string away, so multi-MB tool
+# results never get materialized just to be truncated.
+_TRUNC = reprlib.Repr()
+_TRUNC.maxstring = _TOOL_LIMIT
+_TRUNC.maxother = _TOOL_LIMIT
+_TRUNC.maxlist = 10
+_TRUNC.maxdict = 10
+
+
+# Exact-type dispatch for the payload shapes tools actually send.
+# type(x) lookup in a dict is one hash probe versus walking an
+# isinstance chain per call; anything unlisted falls back to the
+# size-bounded Repr.
+_SERIALIZERS: dict[type, Callable[[Any], str]] = {
+    str: lambda s: s if len(s) <= _TOOL_LIMIT else s[:_TOOL_LIMIT],
+    bytes: lambda b: b[:_TOOL_LIMIT].decode("utf-8", errors="replace"),
+}
+
+
+def _truncate_payload(obj: Any) -> str:
+    """Render a tool input/result capped at _TOOL_LIMIT chars.
+
+    Strings and bytes are sliced directly (O(limit), no copy of the
+    tail); everything else goes through the size-bounded Repr.
+    """
+    fn = _SERIALIZERS.get(type(obj))
+    if fn is not None:
+        return fn(obj)
+    return _TRUNC.repr(obj)
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize one log entry to compact UTF-8 bytes.
+
+    orjson produces bytes natively; the stdlib fallback encodes once
+    here so the write path never round-trips through str again.
+    """
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+
+def _loads(data: str | bytes) -> Any:
+    """Parse one JSON document, via orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+# Timestamp fast path: cache the seconds prefix and only format the
+# microsecond suffix per call. Entries within the same second (the
+# common case under bursts of hook events) skip strftime entirely.
+_ts_cache_sec = 0
+_ts_cache_prefix = ""
+
+
+def _isoformat_now() -> str:
+    global _ts_cache_sec, _ts_cache_prefix
+    sec, frac_ns = divmod(time.time_ns(), 1_000_000_000)
+    if sec != _ts_cache_sec:
+        # Prefix first, marker second: a thread racing between the two
+        # assignments then redoes a strftime at worst, instead of
+        # pairing the new second with the previous second's prefix.
+        _ts_cache_prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(sec))
+        _ts_cache_sec = sec
+    return f"{_ts_cache_prefix}.{frac_ns // 1000:06d}+00:00"
+
+
+def _utc_today() -> str:
+    """Today's UTC date as YYYY-MM-DD, via the cached timestamp prefix."""
+    if int(time.time()) != _ts_cache_sec:
+        _isoformat_now()  # refresh the cached prefix
+    return _ts_cache_prefix[:10]
+
+
+class HookType(Enum):
+    """Hook types aligned with Claude Agent SDK."""
+    PRE_TOOL = "pre_tool"
+    POST_TOOL = "post_tool"
+    SESSION_START = "session_start"
+    SESSION_END = "session_end"
+    CONTEXT_COMPACT = "context_compact"
+
+
+@dataclass
+class HookRegistry:
+    """Registry for hook callbacks.
+
+    Callbacks are classified as coroutine or plain once at registration,
+    so trigger() does no per-call imports or inspection. The hook table
+    is preallocated with a list per HookType, making register/trigger a
+    plain indexed lookup with no setdefault/.get fallback.
+    """
+    hooks: dict[HookType, list[tuple[Callable, bool]]] = field(
+        default_factory=lambda: {t: [] for t in HookType})
+
+    def register(self, hook_type: HookType, callback: Callable) -> None:
+        entry = (callback, asyncio.iscoroutinefunction(callback))
+        self.hooks[hook_type].append(entry)
+
+    async def trigger(self, hook_type: HookType, **kwargs) -> None:
+        for callback, is_coro in self.hooks[hook_type]:
+            if is_coro:
+                await callback(**kwargs)
+            else:
+                callback(**kwargs)
+
+
+class _LogWriter:
+    """Background writer shared by all loggers in the process.
+
+    Producers enqueue pre-serialized lines; a single daemon thread
+    drains whatever is queued into one write+flush per file per wakeup,
+    so bursts of log calls never block on disk. flush() parks until the
+    queue is empty and is registered with atexit, which covers normal
+    interpreter shutdown; a hard kill can lose the queued tail.
+    """
+
+    # Bound on queued lines: caps memory if the disk stalls while
+    # producers keep logging, instead of growing without limit.
+    _QUEUE_MAX = 4096
+
+    def __init__(self) -> None:
+        self._q: queue.Queue = queue.Queue(maxsize=self._QUEUE_MAX)
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._handles: dict[str, Any] = {}
+
+    def write(self, path: str, line: bytes) -> None:
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    t = threading.Thread(
+                        target=self._drain, name="agent-log-writer", daemon=True
+                    )
+                    t.start()
+                    self._thread = t
+                    atexit.register(self.close)
+        try:
+            self._q.put_nowait((path, line))
+        except queue.Full:
+            # Backpressure: write synchronously on the caller's thread
+            # rather than dropping the entry or blocking indefinitely.
+            try:
+                with open(path, "ab") as fh:
+                    fh.write(line)
+            except OSError:
+                pass
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Block until everything queued so far has hit the files."""
+        if self._thread is None:
+            return
+        done = threading.Event()
+        self._q.put(("", done))
+        done.wait(timeout)
+
+    def close(self) -> None:
+        """Flush pending lines and release the cached file handles.
+
+        Runs at interpreter exit; handles are reopened on demand if
+        anything logs afterwards, so calling this early is harmless.
+        """
+        self.flush()
+        for fh in self._handles.values():
+            try:
+                fh.close()
+            except OSError:
+                pass
+        self._handles.clear()
+
+    def _drain(self) -> None:
+        q = self._q
+        while True:
+            item = q.get()
+            batch: dict[str, list[bytes]] = {}
+            markers: list[threading.Event] = []
+            while True:
+                path, data = item
+                if isinstance(data, threading.Event):
+                    markers.append(data)
+                else:
+                    batch.setdefault(path, []).append(data)
+                try:
+                    item = q.get_nowait()
+                except queue.Empty:
+                    break
+            for path, lines in batch.items():
+                try:
+                    fh = self._handles.get(path)
+                    if fh is None:
+                        # Binary append: entries are already UTF-8 bytes,
+                        # so no TextIOWrapper encode per write.
+                        fh = self._handles[path] = open(path, "ab")
+                    fh.write(b"".join(lines))
+                    fh.flush()
+                except OSError:
+                    continue
+            for done in markers:
+                done.set()
+
+
+_writer = _LogWriter()
+
+# Log directories this process has already created: each new logger for
+# the same date dir skips the mkdir syscalls entirely.
+_ensured_dirs: set[str] = set()
+
+# Module-level session tracking
+_current_session: str | None = None
+_hook_registry = HookRegistry()
+
+
+# Resolved once at import: the home directory and global logs root never
+# change within a process, so no function re-reads the environment or
+# rebuilds these Paths.
+_HOME = Path(os.environ.get("HOME") or Path.home())
+_LOGS_ROOT = _HOME / ".claude" / "logs"
+
+
+def _get_home() -> Path:
+    return _HOME
+
+
+def _generate_session_id() -> str:
+    date_part = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
+    # os.urandom + bytes.hex is the same entropy source without paying
+    # for the secrets module import on first logger construction.
+    random_part = os.urandom(4).hex()
+    return f"sess_{date_part}_{random_part}"
+
+
+def get_current_session() -> str:
+    global _current_session
+    if _current_session is None:
+        _current_session = _generate_session_id()
+    return _current_session
+
+
+def set_current_session(session_id: str) -> None:
+    global _current_session
+    _current_session = session_id
+
+
+@lru_cache(maxsize=None)
+def _find_project_root(cwd: Path) -> Path | None:
+    """Walk cwd's parents for a project .claude dir, cached per cwd.
+
+    The walk is a stat per ancestor directory; loggers and the
+    get_logger factory probe it repeatedly, and the answer is stable
+    for a given working directory.
+    """
+    home = _get_home()
+    for parent in [cwd, *cwd.parents]:
+        if (parent / ".claude").is_dir() and parent != home:
+            return parent
+    return None
+
+
+def is_project_context() -> bool:
+    return _find_project_root(Path.cwd()) is not None
+
+
+def get_project_root() -> Path | None:
+    return _find_project_root(Path.cwd())
+
+
+# The two jq filter shapes that cover almost every query in practice:
+# an equality selector and a bare field projection. These run in-process
+# instead of paying fork/exec plus a full pipe round-trip per query;
+# anything else still goes to jq.
+_JQ_SELECT_EQ = re.compile(r'^\s*select\(\s*\.(\w+)\s*==\s*"([^"\\]*)"\s*\)\s*$')
+_JQ_FIELD = re.compile(r"^\s*\.(\w+)\s*$")
+
+
+def _query_simple(jq_filter: str, log_path: Path) -> list[Any] | None:
+    """Evaluate a simple jq filter in-process, or None if unsupported."""
+    eq = _JQ_SELECT_EQ.match(jq_filter)
+    field = None if eq else _JQ_FIELD.match(jq_filter)
+    if eq is None and field is None:
+        return None
+
+    results: list[Any] = []
+
+    # Printable ASCII only: the JSON encoder escapes non-ASCII *and*
+    # control characters (tab etc.) on disk, so a raw-byte needle built
+    # from either would never match and silently drop hits.
+    if eq is not None and eq.group(2).isascii() and eq.group(2).isprintable():
+        # Equality selectors scan the file as a memory map: bytes.find
+        # (C memmem) locates candidate '"key":"value"' hits at memory
+        # bandwidth and only the containing lines get JSON-parsed. The
+        # parse re-checks the field, so a substring hit inside a
+        # message cannot produce a false match.
+        key, val = eq.group(1), eq.group(2)
+        needle = f'"{key}":"{val}"'.encode()
+        with open(log_path, "rb") as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                return results
+            with mm:
+                i = mm.find(needle)
+                while i != -1:
+                    start = mm.rfind(b"\n", 0, i) + 1
+                    end = mm.find(b"\n", i)
+                    if end == -1:
+                        end = len(mm)
+                    try:
+                        entry = _loads(mm[start:end])
+                    except ValueError:
+                        entry = None
+                    if entry is not None and entry.get(key) == val:
+                        results.append(entry)
+                    i = mm.find(needle, end)
+        return results
+
+    with open(log_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if len(line) <= 1:
+                continue
+            try:
+                entry = _loads(line)
+            except ValueError:
+                continue
+            if eq is not None:
+                if entry.get(eq.group(1)) == eq.group(2):
+                    results.append(entry)
+            else:
+                results.append(entry.get(field.group(1)))
+    return results
+
+
+class AgentLogger:
+    """
+    JSONL logger with hooks support for meta-agent architecture.
+
+    Usage:
+        log = get_logger(agent_id="spec:backend:auth01")
+
+        # Register hooks
+        @log.hook(HookType.PRE_TOOL)
+        def before_tool(tool_name, tool_input):
+            print(f"Calling {tool_name}")
+
+        # Log events
+        log.task_started("Implementing auth")
+        log.decision_made("Using JWT", rationale="Industry standard")
+    """
+
+    def __init__(
+        self,
+        session_id: str | None = None,
+        agent_id: str = "orch:default",
+        *,
+        batch_size: int = 1,
+    ) -> None:
+        if session_id is None:
+            self.session_id = get_current_session()
+        else:
+            self.session_id = session_id
+            set_current_session(session_id)
+
+        self.agent_id = agent_id
+        # itertools.count increments in C under the GIL, so concurrent
+        # log calls (producers + hook threads) can take IDs without a
+        # lock and never observe a torn or duplicated sequence number.
+        self._seq = itertools.count(1)
+        # The session part of every correlation ID is fixed; format it
+        # once so each new ID is one small-int format plus a concat.
+        self._cid_prefix = f"corr_{self.session_id}_"
+        # The session id is caller-supplied, so the prefix may contain
+        # quotes, backslashes, or non-ASCII; render it through the JSON
+        # encoder once (quotes stripped) so the fast path can splice it
+        # in as-is.
+        self._cid_prefix_json = _dumps(self._cid_prefix)[1:-1]
+        # Partial evaluation of the fast-path envelope: the agent id is
+        # constant for the lifetime of the logger, so its JSON-escaped
+        # rendering (plus the surrounding punctuation) is built once.
+        self._aid_json = b'","aid":' + _dumps(agent_id) + b',"evt":'
+        self._log_dir = self._get_log_dir()
+        # Stored as a plain string: the write path only needs it for the
+        # single lazy open, and str skips Path allocation/__fspath__
+        # dispatch there.
+        self._log_file = os.path.join(str(self._log_dir), f"{self.session_id}.jsonl")
+        self._ensure_dir()
+        self._local_hooks = HookRegistry()
+        self._start_time = datetime.now(timezone.utc)
+        self._tokens_used = 0
+        # Opt-in batching for tight hook loops: serialized lines are
+        # collected and enqueued as one chunk every batch_size events.
+        # Each element stays a complete JSONL line, so the file format
+        # (and jq) are unaffected; only queue and write granularity
+        # change. The default of 1 keeps every event immediate.
+        self._batch_size = batch_size
+        self._ring: list[bytes] = []
+
+    def _get_log_dir(self) -> Path:
+        return _LOGS_ROOT / _utc_today()
+
+    def _ensure_dir(self) -> None:
+        key = str(self._log_dir)
+        if key not in _ensured_dirs:
+            self._log_dir.mkdir(parents=True, exist_ok=True)
+            _ensured_dirs.add(key)
+
+    def _next_correlation_id(self) -> str:
+        return self._cid_prefix + format(next(self._seq), "03d")
+
+    def _now(self) -> str:
+        return _isoformat_now()
+
+    def hook(self, hook_type: HookType) -> Callable:
+        """Decorator to register a hook callback."""
+        def decorator(func: Callable) -> Callable:
+            self._local_hooks.register(hook_type, func)
+            return func
+        return decorator
+
+    def log(
+        self,
+        lvl: LogLevel,
+        evt: str,
+        msg: str,
+        *,
+        cid: str | None = None,
+        **kwargs: Any,
+    ) -> str:
+        # Truncation only copies when a message is actually over the
+        # limit; the common short-message path is a single len check.
+        if len(msg) > _MSG_LIMIT:
+            msg = msg[:_MSG_LIMIT - 3] + "..."
+
+        # Fast path for the common call shape (no explicit cid, no
+        # extra fields): concatenate the line from pre-rendered bytes
+        # instead of building and serializing a dict. ts/lvl and the
+        # sequence suffix are ASCII by construction; the session prefix
+        # was JSON-escaped at construction; evt and msg go through the
+        # JSON encoder for escaping.
+        if cid is None and not kwargs:
+            seq = format(next(self._seq), "03d")
+            correlation_id = self._cid_prefix + seq
+            line = (
+                b'{"ts":"' + self._now().encode("ascii")
+                + b'","lvl":"' + lvl.encode("ascii")
+                + b'","cid":"' + self._cid_prefix_json + seq.encode("ascii")
+                + self._aid_json
+                + _dumps(evt)
+                + b',"msg":' + _dumps(msg)
+                + b"}\n"
+            )
+        else:
+            correlation_id = cid or self._next_correlation_id()
+            entry = {
+                "ts": self._now(),
+                "lvl": lvl,
+                "cid": correlation_id,
+                "aid": self.agent_id,
+                "evt": evt,
+                "msg": msg,
+                **kwargs,
+            }
+            line = _dumps(entry) + b"\n"
+
+        # Hand the serialized line to the shared background writer; the
+        # producer never blocks on disk, and the drain thread batches
+        # bursts into single writes on a persistent handle.
+        if self._batch_size > 1:
+            self._ring.append(line)
+            if len(self._ring) >= self._batch_size:
+                self._flush_ring()
+        else:
+            _writer.write(self._log_file, line)
+
+        return correlation_id
+
+    def _flush_ring(self) -> None:
+        if self._ring:
+            _writer.write(self._log_file, b"".join(self._ring))
+            self._ring.clear()
+
+    def close(self) -> None:
+        """Flush everything this process has queued to disk."""
+        self._flush_ring()
+        _writer.flush()
+
+    # Hook-aware logging methods
+    def log_pre_tool(self, tool_name: str, tool_input: Any) -> str:
+        """Log before tool execution (hook.pre_tool)."""
+        return self.log(
+            "debug", "hook.pre_tool", f"Executing {tool_name}",
+            tool_name=tool_name,
+            tool_input=_truncate_payload(tool_input)
+        )
+
+    def log_post_tool(
+        self,
+        tool_name: str,
+        tool_result: Any,
+        duration_ms: int | None = None
+    ) -> str:
+        """Log after tool execution (hook.post_tool)."""
+        extra = {"tool_name": tool_name}
+        if duration_ms is not None:
+            extra["duration_ms"] = duration_ms
+        return self.log(
+            "debug", "hook.post_tool", f"Completed {tool_name}",
+            tool_result=_truncate_payload(tool_result),
+            **extra
+        )
+
+    def log_context_compact(
+        self,
+        tokens_before: int,
+        tokens_after: int,
+        preserved_decisions: list[str] | None = None,
+        msg: str | None = None,
+    ) -> str:
+        """Log context compaction event.
+
+        The structured fields carry all the data; callers on hot paths
+        can pass msg explicitly (even "") to skip building the default
+        human-readable string.
+        """
+        if msg is None:
+            msg = f"Compacted context: {tokens_before} → {tokens_after}"
+        return self.log(
+            "info", "context.compacted", msg,
+            tokens_before=tokens_before,
+            tokens_after=tokens_after,
+            tokens_saved=tokens_before - tokens_after,
+            preserved_decisions=preserved_decisions or []
+        )
+
+    # Standard logging methods
+    def task_started(self, description: str, **kwargs: Any) -> str:
+        return self.log("info", "task.started", description, **kwargs)
+
+    def task_completed(self, description: str, **kwargs: Any) -> str:
+        return self.log("info", "task.completed", description, **kwargs)
+
+    def decision_made(
+        self,
+        decision: str,
+        *,
+        rationale: str | None = None,
+        alternatives: list[str] | None = None,
+        thinking_budget: int | None = None,
+        **kwargs: Any,
+    ) -> str:
+        # Build the dict in one comprehension instead of allocating an
+        # empty one and growing it branch by branch.
+        extra = {
+            k: v
+            for k, v in (
+                ("rationale", rationale),
+                ("alternatives", alternatives),
+                ("thinking_budget", thinking_budget),
+            )
+            if v
+        }
+        return self.log("info", "decision.made", decision, **extra, **kwargs)
+
+    def agent_spawned(
+        self,
+        child_agent_id: str,
+        *,
+        task: str | None = None,
+        thinking_trigger: str | None = None,
+        msg: str | None = None,
+        **kwargs: Any,
+    ) -> str:
+        if msg is None:
+            msg = f"Spawned {child_agent_id}"
+        extra = {
+            k: v
+            for k, v in (
+                ("child_aid", child_agent_id),
+                ("task", task),
+                ("thinking_trigger", thinking_trigger),
+            )
+            if v
+        }
+        return self.log("info", "agent.spawned", msg, **extra, **kwargs)
+
+    def handoff(
+        self,
+        target_agent_id: str,
+        *,
+        critical_decisions: list[str] | None = None,
+        open_questions: list[str] | None = None,
+        files_to_review: list[str] | None = None,
+        summary_tokens: int | None = None,
+        msg: str | None = None,
+        **kwargs: Any,
+    ) -> str:
+        if msg is None:
+            msg = f"Handoff to {target_agent_id}"
+        extra = {
+            k: v
+            for k, v in (
+                ("target_aid", target_agent_id),
+                ("critical_decisions", critical_decisions),
+                ("open_questions", open_questions),
+                ("files_to_review", files_to_review),
+                ("summary_tokens", summary_tokens),
+            )
+            if v
+        }
+        return self.log("info", "handoff.initiated", msg, **extra, **kwargs)
+
+    def escalation(
+        self,
+        reason: str,
+        *,
+        severity: Literal["blocked", "uncertain", "security"] = "blocked",
+        context: str | None = None,
+        **kwargs: Any,
+    ) -> str:
+        lvl: LogLevel = "error" if severity == "security" else "warn"
+        extra = {
+            k: v
+            for k, v in (("severity", severity), ("context", context))
+            if v
+        }
+        return self.log(lvl, "escalation.raised", reason, **extra, **kwargs)
+
+    def __enter__(self) -> AgentLogger:
+        self._start_time = datetime.now(timezone.utc)
+        self.log("info", "hook.session_start", f"Session {self.session_id} started")
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_val: BaseException | None,
+        exc_tb: TracebackType | None,
+    ) -> bool:
+        duration_ms = int(
+            (datetime.now(timezone.utc) - self._start_time).total_seconds() * 1000
+        )
+        if exc_type is not None:
+            self.log(
+                "error", "hook.session_end",
+                f"Session ended with error: {exc_type.__name__}",
+                error=str(exc_val),
+                duration_ms=duration_ms
+            )
+        else:
+            self.log(
+                "info", "hook.session_end",
+                f"Session {self.session_id} ended",
+                duration_ms=duration_ms
+            )
+        self.close()
+        return False
+
+    def query(
+        self,
+        jq_filter: str,
+        *,
+        session_id: str | None = None,
+        date: str | None = None,
+    ) -> list[dict[str, Any]]:
+        # Ensure our own batched and queued entries are on disk before
+        # reading back.
+        self._flush_ring()
+        _writer.flush()
+
+        if date is None:
+            date = _utc_today()
+
+        sid = session_id or self.session_id
+        log_path = _LOGS_ROOT / date / f"{sid}.jsonl"
+
+        if not log_path.exists():
+            return []
+
+        entries = _query_simple(jq_filter, log_path)
+        if entries is not None:
+            return entries
+
+        try:
+            result = subprocess.run(
+                ["jq", "-c", jq_filter, str(log_path)],
+                capture_output=True,
+                text=True,
+                check=True,
+            )
+            entries = []
+            for line in result.stdout.strip().splitlines():
+                if line:
+                    entries.append(_loads(line))
+            return entries
+        except FileNotFoundError:
+            raise RuntimeError("jq not found. Install with: brew install jq (macOS) or apt install jq (Linux)")
+        except subprocess.CalledProcessError as e:
+            raise RuntimeError(f"jq query failed: {e.stderr}")
+
+
+class ProjectLogger(AgentLogger):
+    """Logger for project-scoped logs at project/.claude/logs/"""
+
+    def __init__(
+        self,
+        session_id: str | None = None,
+        agent_id: str = "orch:default",
+        *,
+        project_root: Path | None = None,
+    ) -> None:
+        self._project_root = project_root or get_project_root()
+        if self._project_root is None:
+            raise ValueError(
+                "Not in a project context. Use AgentLogger for global logging."
+            )
+        super().__init__(session_id, agent_id)
+
+    def _get_log_dir(self) -> Path:
+        return self._project_root / ".claude" / "logs" / _utc_today()
+
+
+_logger_cache: dict[tuple[str, str, bool], AgentLogger] = {}
+
+# Retention does not need per-invocation granularity: auto cleanup runs
+# at most once per interval, tracked by the mtime of a marker file.
+_CLEANUP_INTERVAL_S = 3600
+
+
+def _cleanup_due() -> bool:
+    """True when periodic cleanup should run; touches the marker."""
+    marker = _LOGS_ROOT / ".last_cleanup"
+    try:
+        if time.time() - marker.stat().st_mtime < _CLEANUP_INTERVAL_S:
+            return False
+    except OSError:
+        pass
+    try:
+        marker.parent.mkdir(parents=True, exist_ok=True)
+        marker.touch()
+    except OSError:
+        pass
+    return True
+
+
+def get_logger(
+    session_id: str | None = None,
+    agent_id: str = "orch:default",
+    *,
+    prefer_project: bool = True,
+    auto_cleanup: bool = True,
+) -> AgentLogger:
+    """
+    Factory function to get appropriate logger.
+
+    Instances are cached per (session, agent, scope): asking for the
+    same logger twice returns the existing instance instead of paying
+    initialization and directory setup again.
+
+    Args:
+        session_id: Optional session ID. Auto-generated if not provided.
+        agent_id: Agent identifier (e.g., "spec:backend:auth01")
+        prefer_project: If True and in project context, use ProjectLogger
+        auto_cleanup: If True, run cleanup on initialization (at most
+            once per hour across processes)
+
+    Returns:
+        AgentLogger or ProjectLogger instance
+    """
+    if auto_cleanup and _cleanup_due():
+        cleanup_logs(quiet=True)
+
+    # Resolve the project root once and hand it to ProjectLogger so
+    # construction never repeats the upward directory walk.
+    project_root = get_project_root() if prefer_project else None
+    use_project = project_root is not None
+    sid = session_id or get_current_session()
+    key = (sid, agent_id, use_project)
+    logger = _logger_cache.get(key)
+    if logger is None:
+        if use_project:
+            logger = ProjectLogger(sid, agent_id, project_root=project_root)
+        else:
+            logger = AgentLogger(sid, agent_id)
+        _logger_cache[key] = logger
+    return logger
+
+
+# =============================================================================
+# Log Management & Cleanup
+# =============================================================================
+
+# Configuration defaults
+LOG_RETENTION_DAYS = 7          # Keep logs for 7 days
+LOG_MAX_SIZE_MB = 50            # Max total log size in MB
+LOG_MAX_FILES = 100             # Max number of log files
+COMPACT_AFTER_DAYS = 3          # Compact logs older than 3 days
+
+# Events critical for memory, matched on the raw JSONL bytes during
+# compaction. The fixed alternation lets re scan lines at near memory
+# bandwidth, so the keep/drop decision never needs a JSON decode.
+_COMPACT_KEEP_RE = re.compile(
+    rb'"evt":"(?:decision\.made|escalation\.raised|handoff\.initiated'
+    rb'|hook\.session_(?:start|end)|task\.(?:started|completed)'
+    rb'|context\.compacted)"'
+    rb'|"lvl":"(?:error|fatal|warn)"'
+)
+
+
+def _iter_log_files(log_dir: Path):
+    """Yield (DirEntry, date_dir_name) for each .jsonl under log_dir.
+
+    Logs live exactly one level deep (<log_dir>/<date>/<session>.jsonl),
+    so two os.scandir levels cover the tree. The iteration runs in C,
+    DirEntry caches its stat result, and no intermediate Path objects
+    are built — callers work with plain strings until they act on a
+    file.
+    """
+    try:
+        date_dirs = os.scandir(log_dir)
+    except OSError:
+        return
+    with date_dirs:
+        for date_dir in date_dirs:
+            if not date_dir.is_dir():
+                continue
+            try:
+                entries = os.scandir(date_dir.path)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.name.endswith(".jsonl") and entry.is_file():
+                        yield entry, date_dir.name
+
+
+def get_log_stats(log_dir: Path | None = None) -> dict[str, Any]:
+    """Get statistics about current log storage."""
+    if log_dir is None:
+        log_dir = _LOGS_ROOT
+
+    if not log_dir.exists():
+        return {"total_files": 0, "total_size_bytes": 0, "total_size_mb": 0.0, "oldest_date": None, "newest_date": None}
+
+    total_files = 0
+    total_size = 0
+    seen_dates: set[str] = set()
+    for entry, date_name in _iter_log_files(log_dir):
+        total_files += 1
+        total_size += entry.stat().st_size
+        if date_name.startswith("20"):
+            seen_dates.add(date_name)
+    dates = sorted(seen_dates)
+
+    return {
+        "total_files": total_files,
+        "total_size_bytes": total_size,
+        "total_size_mb": round(total_size / (1024 * 1024), 2),
+        "oldest_date": dates[0] if dates else None,
+        "newest_date": dates[-1] if dates else None,
+        "dates": dates,
+    }
+
+
+def cleanup_logs(
+    log_dir: Path | None = None,
+    retention_days: int = LOG_RETENTION_DAYS,
+    max_size_mb: float = LOG_MAX_SIZE_MB,
+    max_files: int = LOG_MAX_FILES,
+    dry_run: bool = False,
+    quiet: bool = False,
+) -> dict[str, Any]:
+    """
+    Clean up old logs based on retention policy.
+
+    Args:
+        log_dir: Log directory (default: ~/.claude/logs)
+        retention_days: Delete logs older than this many days
+        max_size_mb: Maximum total size before cleanup
+        max_files: Maximum number of log files to keep
+        dry_run: If True, report what would be deleted without deleting
+        quiet: If True, suppress output
+
+    Returns:
+        Dict with cleanup statistics
+    """
+    if log_dir is None:
+        log_dir = _LOGS_ROOT
+
+    if not log_dir.exists():
+        return {"deleted_files": 0, "freed_bytes": 0, "reason": "no_logs"}
+
+    cutoff_str = time.strftime(
+        "%Y-%m-%d", time.gmtime(time.time() - retention_days * 86400)
+    )
+
+    # reasons doubles as the marked set: dicts give O(1) membership and
+    # preserve marking order, so no separate list to keep in sync and no
+    # linear "already marked?" scans inside the passes below.
+    reasons: dict[str, str] = {}
+
+    # Stat each file exactly once: (path, size, mtime, date), oldest
+    # first. Sizes are reused across all three passes and the
+    # freed-bytes sum below instead of re-statting per pass.
+    file_info = sorted(
+        (
+            (entry.path, s.st_size, s.st_mtime, date_name)
+            for entry, date_name in _iter_log_files(log_dir)
+            for s in (entry.stat(),)
+        ),
+        key=lambda t: t[2],
+    )
+    all_files = [path for path, _, _, _ in file_info]
+    sizes = {path: size for path, size, _, _ in file_info}
+
+    # 1. Mark files older than retention period
+    for path, _, _, date_name in file_info:
+        if date_name < cutoff_str:
+            reasons[path] = f"older than {retention_days} days"
+
+    # 2. Check total size and mark oldest files if over limit
+    total_size = sum(sizes.values())
+    max_size_bytes = max_size_mb * 1024 * 1024
+
+    if total_size > max_size_bytes:
+        remaining = [f for f in all_files if f not in reasons]
+        current_size = sum(sizes[f] for f in remaining)
+
+        for f in remaining:
+            if current_size <= max_size_bytes * 0.8:  # Clean to 80% of limit
+                break
+            reasons[f] = f"over size limit ({max_size_mb}MB)"
+            current_size -= sizes[f]
+
+    # 3. Check file count and mark oldest if over limit
+    remaining = [f for f in all_files if f not in reasons]
+    if len(remaining) > max_files:
+        excess = len(remaining) - int(max_files * 0.8)  # Clean to 80% of limit
+        for f in remaining[:excess]:
+            reasons[f] = f"over file limit ({max_files})"
+
+    # Calculate stats
+    files_to_delete = list(reasons)
+    freed_bytes = sum(sizes[f] for f in files_to_delete)
+
+    if not quiet and files_to_delete:
+        print(f"Log cleanup: {len(files_to_delete)} files, {freed_bytes / 1024:.1f}KB")
+
+    # Perform deletion
+    deleted_files = 0
+    if not dry_run:
+        touched_dirs: set[str] = set()
+        for f in files_to_delete:
+            try:
+                os.unlink(f)
+                deleted_files += 1
+            except OSError:
+                continue
+            touched_dirs.add(os.path.dirname(f))
+            # Drop the compaction marker along with its log file.
+            try:
+                os.unlink(f + ".compacted")
+            except OSError:
+                pass
+
+        # Remove date directories emptied by the deletions above. rmdir
+        # refuses non-empty directories on its own, so no pre-listing
+        # of every date dir is needed.
+        for d in touched_dirs:
+            try:
+                os.rmdir(d)
+            except OSError:
+                pass
+
+    return {
+        "deleted_files": deleted_files if not dry_run else len(files_to_delete),
+        "freed_bytes": freed_bytes,
+        "freed_mb": round(freed_bytes / (1024 * 1024), 2),
+        "dry_run": dry_run,
+        "files": list(files_to_delete) if dry_run else [],
+        "reasons": dict(reasons) if dry_run else {},
+    }
+
+
+def compact_old_sessions(
+    log_dir: Path | None = None,
+    days_threshold: int = COMPACT_AFTER_DAYS,
+    dry_run: bool = False,
+) -> dict[str, Any]:
+    """
+    Compact old session logs by keeping only decision events.
+
+    Preserves: decision.made, escalation.raised, handoff.initiated, session_start/end
+    Removes: hook events, debug logs, verbose tool outputs
+
+    Args:
+        log_dir: Log directory (default: ~/.claude/logs)
+        days_threshold: Compact sessions older than this many days
+        dry_run: If True, report what would be compacted
+
+    Returns:
+        Dict with compaction statistics
+    """
+    if log_dir is None:
+        log_dir = _LOGS_ROOT
+
+    if not log_dir.exists():
+        return {"compacted_files": 0, "saved_bytes": 0}
+
+    cutoff_str = time.strftime(
+        "%Y-%m-%d", time.gmtime(time.time() - days_threshold * 86400)
+    )
+
+    compacted = 0
+    saved_bytes = 0
+
+    for entry, date_dir in _iter_log_files(log_dir):
+        if date_dir >= cutoff_str:
+            continue  # Skip recent logs
+
+        log_file = entry.path
+
+        # A zero-byte sidecar marks files already compacted, so repeat
+        # invocations (auto_cleanup runs on every get_logger call) pay
+        # one stat here instead of re-scanning the whole file.
+        marker = log_file + ".compacted"
+        if os.path.exists(marker):
+            continue
+        original_size = entry.stat().st_size
+        tmp_path = log_file + ".tmp"
+
+        try:
+            if dry_run:
+                # Read-only preview: tally what the rewrite would keep
+                # without creating a temp file next to every candidate.
+                kept_bytes = 0
+                with open(log_file, "rb") as src:
+                    for line in src:
+                        if len(line) <= 1:
+                            continue
+                        if _COMPACT_KEEP_RE.search(line):
+                            kept_bytes += len(line)
+                if kept_bytes:
+                    saved_bytes += original_size - kept_bytes
+                    compacted += 1
+                continue
+
+            # Stream kept lines straight into a sibling temp file, then
+            # swap it in with an atomic rename — peak memory stays at
+            # one line regardless of file size, and a crash mid-compact
+            # leaves the original intact.
+            kept = 0
+            with open(log_file, "rb") as src, open(tmp_path, "wb") as dst:
+                for line in src:
+                    if len(line) <= 1:
+                        continue
+                    # Keep/drop is decided on the raw bytes: one regex
+                    # search per line instead of a JSON decode. A stray
+                    # match inside a message only over-preserves.
+                    if _COMPACT_KEEP_RE.search(line):
+                        if not line.endswith(b"\n"):
+                            line += b"\n"
+                        dst.write(line)
+                        kept += 1
+
+            if kept:
+                os.replace(tmp_path, log_file)
+                new_size = os.stat(log_file).st_size
+                saved_bytes += original_size - new_size
+                compacted += 1
+            else:
+                os.unlink(tmp_path)
+            # Touch the marker even when nothing was kept: the
+            # decision is made either way and need not be repeated.
+            open(marker, "wb").close()
+
+        except (OSError, IOError):
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            continue
+
+    return {
+        "compacted_files": compacted,
+        "saved_bytes": saved_bytes,
+        "saved_mb": round(saved_bytes / (1024 * 1024), 2),
+        "dry_run": dry_run,
+    }